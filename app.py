@@ -15,10 +15,30 @@ Estructura:
 
 import requests  
 import os
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, Response, stream_with_context, jsonify
+from flask_caching import Cache
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 import random
-import googlemaps  
+import threading
+import time
+import functools
+import sqlite3
+import unicodedata
+from cachetools import TTLCache
+
+# orjson parsea JSON bastante más rápido que el módulo estándar; si no está
+# instalado se usa json (ambos aceptan bytes y devuelven los mismos dicts)
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import MaxRetryError, ResponseError
 
 # ======================
 # CONFIGURACIÓN INICIAL
@@ -30,6 +50,35 @@ load_dotenv(override=True)
 # Inicializa la aplicación Flask
 app = Flask(__name__)
 
+# Caché de resultados completos de búsqueda. SimpleCache vive en memoria del
+# proceso; con varios workers puede usarse Redis (CACHE_TYPE=RedisCache y
+# CACHE_REDIS_URL en el .env)
+cache = Cache(app, config={
+    "CACHE_TYPE": os.getenv("CACHE_TYPE", "SimpleCache"),
+    "CACHE_REDIS_URL": os.getenv("CACHE_REDIS_URL"),
+    "CACHE_DEFAULT_TIMEOUT": 300
+})
+
+# Detrás de un proxy inverso (nginx delante de gunicorn) todas las peticiones
+# llegan desde la IP del proxy. TRUSTED_PROXIES indica cuántos proxies hay
+# delante para tomar la IP real del cliente de X-Forwarded-For; sin esto todos
+# los usuarios compartirían el mismo límite de peticiones
+TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", "0"))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES)
+
+# Límite de peticiones por IP: cada búsqueda genera muchas llamadas a APIs
+# externas, así que un solo cliente podría agotar las cuotas de todos.
+# Con varios workers conviene un almacenamiento compartido (p. ej. redis://)
+# y detrás de un proxy hay que configurar TRUSTED_PROXIES (ver arriba)
+limiter = Limiter(
+    get_remote_address,
+    app=app,
+    default_limits=["60/minute"],
+    storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "memory://"),
+    headers_enabled=True
+)
+
 # ======================
 # CONSTANTES Y CLIENTES
 # ======================
@@ -43,8 +92,130 @@ GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")   # Key para Google Maps
 
 MAX_RESULTS = 9  # Límite máximo de conciertos a mostrar en los resultados
 
-# Cliente de Google Maps para geocodificación
-gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
+# Nombres de artista aceptados, por categoría Unicode: letras (L), marcas
+# combinantes (M, p. ej. "अरिजीत"), números (N), espacios (Z) y puntuación (P,
+# p. ej. "AC/DC", "*NSYNC", '"Weird Al" Yankovic'). Además, los pocos símbolos
+# que aparecen en nombres reales ("Ke$ha", "+44"); emojis y demás se rechazan
+MAX_ARTIST_NAME_LENGTH = 100
+ARTIST_NAME_CATEGORIES = ("L", "M", "N", "Z", "P")
+ARTIST_NAME_SYMBOLS = "$+"
+
+# Base SQLite con coordenadas de ciudades ya geocodificadas (persiste entre reinicios)
+CITY_CACHE_PATH = os.getenv(
+    "CITY_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cities.sqlite")
+)
+
+
+HTTP_WORKERS = 32     # Hilos para llamadas externas = conexiones por host del pool
+MAX_RETRY_AFTER = 5  # Segundos máximos que se espera por un Retry-After
+
+
+class JitterRetry(Retry):
+    """Retry de urllib3 que añade un retardo aleatorio al backoff exponencial
+    para que varios clientes no reintenten todos al mismo tiempo.
+
+    Los Retry-After mayores que MAX_RETRY_AFTER no se esperan: se deja de
+    reintentar y se devuelve la respuesta (el 429 acaba en RateLimitError)"""
+
+    def get_backoff_time(self):
+        # urllib3 devuelve 0 en el primer reintento (y su backoff_jitter no se
+        # aplica ahí), justo cuando más clientes coinciden: se suma siempre
+        return super().get_backoff_time() + random.uniform(0, 0.25)
+
+    def increment(self, method=None, url=None, response=None, error=None,
+                  _pool=None, _stacktrace=None):
+        if response is not None and self.respect_retry_after_header:
+            retry_after = super().get_retry_after(response)
+            if retry_after is not None and retry_after > MAX_RETRY_AFTER:
+                # Con raise_on_status=False urllib3 devuelve la última respuesta
+                raise MaxRetryError(_pool, url, ResponseError(
+                    f"Retry-After de {retry_after}s supera el máximo de {MAX_RETRY_AFTER}s"
+                ))
+        return super().increment(method, url, response=response, error=error,
+                                 _pool=_pool, _stacktrace=_stacktrace)
+
+
+class RateLimitError(Exception):
+    """Una API externa sigue respondiendo 429 después de agotar los reintentos"""
+
+
+# Sesión HTTP compartida por todos los servicios: reutiliza conexiones
+# (keep-alive) en lugar de abrir un nuevo TCP+TLS en cada petición.
+# Solo se reintentan los 429/5xx, con backoff exponencial respetando
+# Retry-After; tras el último intento se devuelve la respuesta para poder
+# distinguir el 429. Los errores de conexión y timeouts no se reintentan, así
+# el peor caso de cada llamada es su propio timeout
+HTTP = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=8,           # Un pool por host (Ticketmaster, Spotify, OpenWeather...)
+    pool_maxsize=HTTP_WORKERS,    # Conexiones reutilizables por host (ver HTTP_EXECUTOR)
+    max_retries=JitterRetry(
+        total=3,
+        connect=0,
+        read=0,
+        other=0,
+        status=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "POST"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+)
+HTTP.mount("http://", _adapter)
+HTTP.mount("https://", _adapter)
+
+# Pool de hilos compartido por todas las peticiones del worker para las
+# llamadas externas. Todas las llamadas HTTP pasan por aquí, así nunca hay
+# más conexiones simultáneas por host que pool_maxsize (las que sobran
+# urllib3 las descarta y se pierde el keep-alive) ni un pool nuevo por petición
+HTTP_EXECUTOR = ThreadPoolExecutor(max_workers=HTTP_WORKERS, thread_name_prefix="http")
+
+# Token de Spotify compartido entre peticiones (válido ~1 hora)
+# (token, expiración) se guardan juntos en una tupla para poder leerlos sin
+# lock y siempre de forma consistente
+_spotify_token = {"current": (None, 0.0)}
+_spotify_lock = threading.RLock()
+
+
+def normalize_key(value):
+    """Normaliza nombres de artistas/ciudades/géneros para usarlos como clave de caché"""
+    return (value or "").strip().lower()
+
+
+def ttl_cached(ttl, maxsize=512, key=normalize_key, cache_if=bool):
+    """
+    Decorador de caché en memoria con expiración, compartida por todo el proceso.
+    
+    Args:
+        ttl (int): Segundos que se conserva cada resultado
+        maxsize (int): Número máximo de entradas
+        key (callable): Convierte el argumento en la clave de caché
+        cache_if (callable): Decide si un resultado se guarda. Por defecto
+            no se cachean resultados vacíos, que es lo que devuelven los
+            servicios cuando la API falla
+    """
+    def decorator(func):
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(arg):
+            cache_key = key(arg)
+            with lock:
+                cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            result = func(arg)
+            if cache_if(result):
+                with lock:
+                    cache[cache_key] = result
+            return result
+
+        return wrapper
+    return decorator
 
 # ======================
 # SERVICIO DE CONCIERTOS
@@ -53,6 +224,7 @@ class ConcertService:
     """Encapsula toda la lógica relacionada con la obtención de datos de conciertos"""
     
     @staticmethod
+    @ttl_cached(ttl=300)
     def get_events(artist_name):
         """
         Obtiene eventos musicales de Ticketmaster para un artista específico.
@@ -62,6 +234,9 @@ class ConcertService:
             
         Returns:
             list: Lista de eventos (puede estar vacía si hay error o no hay resultados)
+
+        Raises:
+            RateLimitError: Si Ticketmaster sigue limitando tras los reintentos
             
         Proceso:
             1. Prepara los parámetros de búsqueda (filtra por música y ordena por fecha)
@@ -80,17 +255,19 @@ class ConcertService:
             }
             
             # Petición GET con manejo de timeout
-            response = requests.get(
+            response = HTTP.get(
                 "https://app.ticketmaster.com/discovery/v2/events.json",
                 params=params,
                 timeout=10
             )
+            if response.status_code == 429:
+                raise RateLimitError("Ticketmaster")
             response.raise_for_status()  
             
             # Extrae eventos del campo _embedded (o lista vacía si no existe)
-            return response.json().get("_embedded", {}).get("events", [])
+            return _json.loads(response.content).get("_embedded", {}).get("events", [])
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             # Registra error en logs y devuelve lista vacía (degradación elegante)
             app.logger.error(f"Error Ticketmaster: {str(e)}")
             return []
@@ -102,6 +279,7 @@ class WeatherService:
     """Maneja la obtención de datos climáticos para ciudades específicas"""
     
     @staticmethod
+    @ttl_cached(ttl=600, cache_if=lambda weather: weather["temperature"] != "N/A")
     def get_weather(city):
         """
         Obtiene condiciones climáticas actuales para una ciudad.
@@ -118,30 +296,218 @@ class WeatherService:
         if not city or city == "Ciudad desconocida":
             return {"description": "Ciudad no especificada", "temperature": "N/A"}
 
-        # Construye URL para OpenWeather API 
-        url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric&lang=es"
+        # Parámetros para OpenWeather API (requests se encarga de codificarlos,
+        # p. ej. "São Paulo")
+        params = {
+            "q": city,
+            "appid": OPENWEATHER_API_KEY,
+            "units": "metric",
+            "lang": "es"
+        }
         
         try:
-            response = requests.get(url, timeout=5)
+            response = HTTP.get(
+                "https://api.openweathermap.org/data/2.5/weather",
+                params=params,
+                timeout=5
+            )
             response.raise_for_status()
-            clima_data = response.json()
+            clima_data = _json.loads(response.content)
 
             # Formatea los datos para la vista
             return {
                 "description": clima_data["weather"][0]["description"].capitalize(),
                 "temperature": round(clima_data["main"]["temp"], 1)  # 1 decimal
             }
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             app.logger.error(f"Error OpenWeather: {str(e)}")
             return {"description": "Datos no disponibles", "temperature": "N/A"}
 
+# ======================
+# SERVICIO DE GEOCODIFICACIÓN
+# ======================
+_city_db = {"conn": None, "pid": None}
+_city_db_lock = threading.Lock()
+
+
+def _city_db_conn():
+    """
+    Conexión a la caché de coordenadas en disco. Se abre una por proceso
+    (los workers de gunicorn no deben compartir la conexión tras el fork).
+    Debe llamarse con _city_db_lock adquirido.
+    """
+    if _city_db["pid"] != os.getpid():
+        conn = sqlite3.connect(CITY_CACHE_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")  # Lecturas sin bloquear a otros workers
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS city_geo ("
+            "name TEXT PRIMARY KEY, lat REAL, lng REAL, ts INTEGER)"
+        )
+        conn.commit()
+        _city_db["conn"], _city_db["pid"] = conn, os.getpid()
+    return _city_db["conn"]
+
+
+class GeocodingService:
+    """
+    Convierte nombres de ciudades en coordenadas para el mapa.
+    
+    Caché en dos niveles: memoria del proceso (lru_cache) y SQLite en disco,
+    así las ciudades habituales no vuelven a geocodificarse tras un reinicio.
+    """
+
+    @staticmethod
+    def get_coordinates(city):
+        """
+        Obtiene latitud y longitud de una ciudad usando la Geocoding API de Google Maps.
+        
+        Args:
+            city (str): Nombre de la ciudad a geocodificar
+            
+        Returns:
+            tuple: (lat, lng) o (None, None) si no se encuentra o hay error
+        """
+        # Validación para ciudad vacía o desconocida (no se geocodifica ni se
+        # guarda el texto de relleno)
+        if not city or city == "Ciudad desconocida":
+            return None, None
+
+        try:
+            return GeocodingService._geocode_cached(normalize_key(city))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            app.logger.error(f"Error Google Maps: {str(e)}")
+            return None, None
+
+    @staticmethod
+    def _load_stored(city):
+        """Busca la ciudad en la caché SQLite; devuelve (lat, lng) o None"""
+        try:
+            with _city_db_lock:
+                return _city_db_conn().execute(
+                    "SELECT lat, lng FROM city_geo WHERE name = ?", (city,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            app.logger.error(f"Error caché de ciudades: {str(e)}")
+            return None
+
+    @staticmethod
+    def _store(city, lat, lng):
+        """Guarda las coordenadas de una ciudad en la caché SQLite"""
+        try:
+            with _city_db_lock:
+                conn = _city_db_conn()
+                conn.execute(
+                    "INSERT OR REPLACE INTO city_geo (name, lat, lng, ts) VALUES (?, ?, ?, ?)",
+                    (city, lat, lng, int(time.time()))
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            app.logger.error(f"Error caché de ciudades: {str(e)}")
+
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _geocode_cached(city):
+        # Las coordenadas de una ciudad no cambian: caché sin expiración.
+        # Los errores se lanzan como excepción para que lru_cache no los guarde
+        stored = GeocodingService._load_stored(city)
+        if stored:
+            return tuple(stored)
+
+        response = HTTP.get(
+            "https://maps.googleapis.com/maps/api/geocode/json",
+            params={"address": city, "key": GOOGLE_MAPS_API_KEY},
+            timeout=5
+        )
+        response.raise_for_status()
+        geo_data = _json.loads(response.content)
+
+        # La API responde 200 incluso con errores; el estado real va en "status"
+        status = geo_data.get("status")
+        if status == "ZERO_RESULTS":
+            return None, None
+        if status != "OK":
+            raise ValueError(f"Geocoding status {status}: {geo_data.get('error_message', '')}")
+
+        location = (geo_data.get("results") or [{}])[0].get("geometry", {}).get("location")
+        if location:
+            GeocodingService._store(city, location["lat"], location["lng"])
+            return location["lat"], location["lng"]
+        return None, None
+
 # ======================
 # SERVICIO DE SPOTIFY
 # ======================
 class SpotifyService:
     """Maneja todas las interacciones con la API de Spotify"""
-    
+
+    @staticmethod
+    def _get_token(stale_token=None):
+        """
+        Devuelve un token de acceso válido (Client Credentials Flow).
+
+        El token se guarda en memoria y solo se pide uno nuevo cuando
+        faltan menos de 30 segundos para que expire, o cuando el token en
+        caché es `stale_token` (Spotify lo rechazó con 401).
+
+        Usa doble comprobación: el caso habitual no toma el lock, y si hace
+        falta renovar, solo el primer hilo que entra hace el POST; el resto
+        encuentra el token nuevo al re-comprobar dentro del lock.
+        """
+        def cached_token():
+            value, exp = _spotify_token["current"]
+            if value and value != stale_token and time.monotonic() < exp - 30:
+                return value
+            return None
+
+        token = cached_token()
+        if token:
+            return token
+
+        with _spotify_lock:
+            token = cached_token()
+            if token:
+                return token
+
+            auth_response = HTTP.post(
+                "https://accounts.spotify.com/api/token",
+                data={"grant_type": "client_credentials"},
+                auth=(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET),
+                timeout=5  # Se hace con el lock tomado: nunca debe colgarse
+            )
+            if auth_response.status_code == 429:
+                raise RateLimitError("Spotify")
+            auth_response.raise_for_status()
+            auth_data = _json.loads(auth_response.content)
+
+            token = auth_data.get("access_token")
+            _spotify_token["current"] = (token, time.monotonic() + auth_data.get("expires_in", 3600))
+            return token
+
     @staticmethod
+    def _get(url, params=None):
+        """
+        GET autenticado contra la API de Spotify.
+
+        Si Spotify responde 401 (token revocado o expirado antes de tiempo)
+        invalida el token en caché y reintenta una sola vez. Lanza
+        RateLimitError si Spotify sigue respondiendo 429.
+        """
+        access_token = SpotifyService._get_token()
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = HTTP.get(url, headers=headers, params=params, timeout=10)
+
+        if response.status_code == 401:
+            access_token = SpotifyService._get_token(stale_token=access_token)
+            headers = {"Authorization": f"Bearer {access_token}"}
+            response = HTTP.get(url, headers=headers, params=params, timeout=10)
+
+        if response.status_code == 429:
+            raise RateLimitError("Spotify")
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    @ttl_cached(ttl=3600)
     def get_artist_info(artist_name):
         """
         Busca información básica de un artista en Spotify.
@@ -153,37 +519,27 @@ class SpotifyService:
             dict/None: Información del artista o None si hay error/no existe
             
         Proceso:
-            1. Obtiene token de acceso (autenticación OAuth)
+            1. Obtiene token de acceso (cacheado, autenticación OAuth)
             2. Busca artistas coincidentes
             3. Devuelve el primer resultado (si existe)
         """
         try:
-            # Paso 1: Obtener token de acceso (Client Credentials Flow)
-            auth_response = requests.post(
-                "https://accounts.spotify.com/api/token",
-                data={"grant_type": "client_credentials"},
-                auth=(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)
-            )
-            auth_response.raise_for_status()
-            access_token = auth_response.json().get("access_token")
-            
-            # Paso 2: Buscar artista
-            headers = {"Authorization": f"Bearer {access_token}"}
+            # Paso 1 y 2: Buscar artista (el token se obtiene de la caché)
             search_url = "https://api.spotify.com/v1/search"
             params = {"q": artist_name, "type": "artist", "limit": 1}
             
-            response = requests.get(search_url, headers=headers, params=params)
-            response.raise_for_status()
-            artists = response.json().get("artists", {}).get("items", [])
+            response = SpotifyService._get(search_url, params=params)
+            artists = _json.loads(response.content).get("artists", {}).get("items", [])
             
             # Devuelve el primer artista o None
             return artists[0] if artists else None
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             app.logger.error(f"Error Spotify: {str(e)}")
             return None
 
     @staticmethod
+    @ttl_cached(ttl=3600, key=lambda artist_id: artist_id)  # Los IDs distinguen mayúsculas
     def get_top_tracks(artist_id):
         """
         Obtiene las canciones más populares de un artista en Spotify.
@@ -192,31 +548,37 @@ class SpotifyService:
             artist_id (str): ID único del artista en Spotify
             
         Returns:
-            list: Canciones populares (vacía si hay error)
+            list: Canciones populares (vacía si hay error), solo con los campos
+                  que usa la plantilla:
+                  {"name", "album", "url", "preview", "image"}
         """
         try:
-            # Obtener token 
-            auth_response = requests.post(
-                "https://accounts.spotify.com/api/token",
-                data={"grant_type": "client_credentials"},
-                auth=(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)
-            )
-            auth_response.raise_for_status()
-            access_token = auth_response.json().get("access_token")
-
             # Consultar top tracks para mercado de EE.UU.
-            headers = {"Authorization": f"Bearer {access_token}"}
-            top_tracks_url = f"https://api.spotify.com/v1/artists/{artist_id}/top-tracks?market=US"
+            top_tracks_url = f"https://api.spotify.com/v1/artists/{artist_id}/top-tracks"
 
-            response = requests.get(top_tracks_url, headers=headers)
-            response.raise_for_status()
-            return response.json().get("tracks", [])
+            response = SpotifyService._get(top_tracks_url, params={"market": "US"})
+            tracks = _json.loads(response.content).get("tracks", [])
+
+            # Descarta el resto del payload (artistas, IDs externos, mercados...)
+            # para que la caché y la plantilla manejen lo mínimo
+            slim_tracks = []
+            for t in tracks:
+                album = t.get("album") or {}
+                slim_tracks.append({
+                    "name": t.get("name"),
+                    "album": album.get("name"),
+                    "url": t.get("external_urls", {}).get("spotify"),
+                    "preview": t.get("preview_url"),
+                    "image": album["images"][0]["url"] if album.get("images") else None
+                })
+            return slim_tracks
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             app.logger.error(f"Error Spotify obtaining top tracks: {str(e)}")
             return []
 
     @staticmethod
+    @ttl_cached(ttl=3600)
     def get_playlists_by_genre(genre):
         """
         Busca playlists relacionadas con un género musical.
@@ -225,34 +587,213 @@ class SpotifyService:
             genre (str): Género musical (ej: "rock", "pop")
             
         Returns:
-            list: Playlists encontradas (vacía si hay error)
+            list: Playlists encontradas (vacía si hay error), solo con
+                  {"name", "url", "image"}
         """
         try:
-            # Obtener token (similar a métodos anteriores)
-            auth_response = requests.post(
-                "https://accounts.spotify.com/api/token",
-                data={"grant_type": "client_credentials"},
-                auth=(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)
-            )
-            auth_response.raise_for_status()
-            access_token = auth_response.json().get("access_token")
-
             # Buscar playlists por género
-            headers = {"Authorization": f"Bearer {access_token}"}
-            search_url = f"https://api.spotify.com/v1/search?q={genre}&type=playlist&limit=10"
+            search_url = "https://api.spotify.com/v1/search"
+            # Solo se muestra una playlist, así que basta con el primer resultado
+            params = {"q": genre, "type": "playlist", "limit": 1}
 
-            response = requests.get(search_url, headers=headers)
-            response.raise_for_status()
-            return response.json().get("playlists", {}).get("items", [])
+            response = SpotifyService._get(search_url, params=params)
+            playlists = _json.loads(response.content).get("playlists", {}).get("items", [])
+
+            # Spotify puede devolver elementos null en la lista de resultados
+            return [
+                {
+                    "name": p.get("name"),
+                    "url": p.get("external_urls", {}).get("spotify"),
+                    "image": p["images"][0]["url"] if p.get("images") else None
+                }
+                for p in playlists if p
+            ]
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             app.logger.error(f"Error Spotify obtaining recommended playlists: {str(e)}")
             return []
 
+# ======================
+# BÚSQUEDA COMPLETA
+# ======================
+@cache.memoize(timeout=300,
+               response_filter=lambda results: bool(results["events"]) and not results["degraded"])
+def search_artist(artist_name):
+    """
+    Reúne todos los datos de una búsqueda (Spotify, Ticketmaster, clima y mapas).
+    
+    El resultado completo se guarda 5 minutos por nombre normalizado: una
+    búsqueda repetida no hace ninguna llamada externa. Solo se cachean
+    resultados completos: las búsquedas sin conciertos o con alguna parte
+    incompleta ("degraded", p. ej. Spotify o el clima fallaron) no se guardan,
+    ya que pueden deberse a un fallo temporal.
+    
+    Args:
+        artist_name (str): Nombre del artista ya normalizado (ver normalize_key)
+        
+    Returns:
+        dict: {"artist_info": dict/None, "top_tracks": list, "events": list,
+               "degraded": bool}
+    
+    Flujo (las llamadas independientes van en paralelo):
+    1. Consultar Ticketmaster (conciertos) y Spotify (info del artista)
+    2. Consultar Spotify (top canciones, playlist por género)
+    3. Para cada ciudad de concierto:
+       - Obtener clima de la ciudad
+       - Geocodificar ciudad para mapa
+    """
+    artist_info = None
+    top_tracks = []
+    events_with_playlists = []
+    degraded = False  # True si falta alguna parte opcional (error o rate limit)
+
+    # Todas las llamadas externas son de I/O, así que se ejecutan en el pool
+    # de hilos compartido (ver HTTP_WORKERS): cada paso espera solo a la
+    # llamada más lenta
+    ex = HTTP_EXECUTOR
+
+    # Paso 1: Conciertos (Ticketmaster) e info del artista (Spotify)
+    # no dependen entre sí y se piden a la vez
+    events_fut = ex.submit(ConcertService.get_events, artist_name)
+    artist_info = ex.submit(SpotifyService.get_artist_info, artist_name).result()
+
+    # Sin artista no se distingue "no existe" de "Spotify falló"
+    if not artist_info:
+        degraded = True
+    else:
+        # Paso 2: Canciones populares y playlists por género en paralelo
+        artist_id = artist_info["id"]
+        top_tracks_fut = ex.submit(SpotifyService.get_top_tracks, artist_id)
+
+        # Playlists por género (primer género disponible). Sin géneros no
+        # hay playlist que mostrar y no se hace la llamada
+        playlists_fut = None
+        artist_genres = artist_info.get("genres", [])
+        if artist_genres:
+            genre = artist_genres[0]
+            playlists_fut = ex.submit(SpotifyService.get_playlists_by_genre, genre)
+
+        # Son datos opcionales: si Spotify nos limita se muestran vacíos en
+        # lugar de perder toda la búsqueda
+        try:
+            top_tracks = top_tracks_fut.result()
+        except RateLimitError as e:
+            app.logger.warning(f"Rate limit en top tracks de {e}")
+            top_tracks = []
+        try:
+            playlists = playlists_fut.result() if playlists_fut else []
+        except RateLimitError as e:
+            app.logger.warning(f"Rate limit en playlists de {e}")
+            playlists = []
+        if not top_tracks or (playlists_fut and not playlists):
+            degraded = True
+        if playlists:
+            # Playlist recomendada (se copia artist_info para no modificar
+            # el dict cacheado)
+            artist_info = {**artist_info, "playlist": playlists[0]}
+
+    # Paso 3: Esperar los conciertos del artista
+    events = events_fut.result()
+
+    if not events:
+        return {"artist_info": artist_info, "top_tracks": top_tracks, "events": [],
+                "degraded": degraded}
+
+    # Paso 4: Procesar cada evento (clima + geocodificación)
+    # Primera pasada: extraer venue, ciudad y coordenadas de cada evento.
+    # Ticketmaster suele incluir la ubicación del recinto en
+    # _embedded.venues[0].location = {"latitude": "...", "longitude": "..."}
+    # (strings), así que solo se geocodifica si no viene en la respuesta
+    event_places = []
+    for event in events:
+        # Un solo acceso por nivel; "or" evita crear dicts vacíos de
+        # respaldo cuando el campo sí existe
+        venues = (event.get("_embedded") or {}).get("venues") or [{}]
+        venue = venues[0]
+        city = (venue.get("city") or {}).get("name") or "Ciudad desconocida"
+        loc = venue.get("location") or {}
+        lat, lng = loc.get("latitude"), loc.get("longitude")
+        try:
+            coords = (float(lat), float(lng)) if lat and lng else None
+        except (TypeError, ValueError):
+            coords = None  # Coordenadas ilegibles: se geocodifica la ciudad
+        event_places.append((event, venue, city, coords))
+
+    # Una sola llamada por ciudad normalizada (varios conciertos en la
+    # misma ciudad comparten resultado)
+    unique_cities = {normalize_key(city): city for _, _, city, _ in event_places}
+    missing_coords = {normalize_key(city): city
+                      for _, _, city, coords in event_places if coords is None}
+    geo_futs = {key: ex.submit(GeocodingService.get_coordinates, city)
+                for key, city in missing_coords.items()}
+    wx_futs = {key: ex.submit(WeatherService.get_weather, city)
+               for key, city in unique_cities.items()}
+
+    # La playlist recomendada es la misma para todos los eventos
+    shared_playlist = (artist_info or {}).get("playlist", {})
+
+    for event, venue, city, coords in event_places:
+        city_key = normalize_key(city)
+
+        # Coordenadas del recinto o, si no vienen, geocodificación con Google Maps
+        lat, lng = coords or geo_futs[city_key].result()
+
+        # Obtener clima para la ciudad
+        weather_data = wx_futs[city_key].result()
+
+        # Clima o coordenadas no disponibles para una ciudad conocida
+        if city != "Ciudad desconocida" and (weather_data["temperature"] == "N/A" or lat is None):
+            degraded = True
+
+        dates = event.get("dates") or {}
+        start = dates.get("start") or {}
+
+        # Estructura de datos para la plantilla
+        event_data = {
+            "city": city,
+            "date": start.get("localDate", "Fecha no disponible"),
+            "venue": venue.get("name", "Lugar no disponible"),
+            "tickets_url": event.get("url", "#"),
+            "weather": weather_data,
+            "location": {"lat": lat, "lng": lng},
+            "playlist": shared_playlist
+        }
+        events_with_playlists.append(event_data)
+
+    return {"artist_info": artist_info, "top_tracks": top_tracks, "events": events_with_playlists,
+            "degraded": degraded}
+
+
 # ======================
 # RUTA PRINCIPAL
 # ======================
+def is_valid_artist_name(artist_name):
+    """Comprueba que cada carácter sea de una categoría Unicode permitida"""
+    return all(
+        unicodedata.category(ch)[0] in ARTIST_NAME_CATEGORIES or ch in ARTIST_NAME_SYMBOLS
+        for ch in artist_name
+    )
+
+@app.errorhandler(RateLimitError)
+def rate_limited(e):
+    """Muestra un aviso distinto de "sin conciertos" cuando una API nos limita"""
+    app.logger.warning(f"Rate limit alcanzado en {e}")
+    return render_template("index.html",
+                           error="Rate limited, try again shortly",
+                           google_maps_api_key=GOOGLE_MAPS_API_KEY), 503
+
+@app.errorhandler(429)
+def too_many_requests(e):
+    """Respuesta cuando un cliente supera su límite de peticiones"""
+    response = jsonify(ok=False, code="agent.rate_limited")
+    response.status_code = 429
+    current_limit = limiter.current_limit
+    if current_limit:
+        response.headers["Retry-After"] = str(max(int(current_limit.reset_at - time.time()), 1))
+    return response
+
 @app.route("/", methods=["GET", "POST"])
+@limiter.limit("10/minute", methods=["POST"])
 def index():
     """
     Ruta principal que maneja:
@@ -261,90 +802,57 @@ def index():
     
     Flujo para POST:
     1. Obtener artista del formulario
-    2. Consultar Spotify (info, top canciones)
-    3. Consultar Ticketmaster (conciertos)
-    4. Para cada concierto:
-       - Obtener clima de la ciudad
-       - Geocodificar ciudad para mapa
-    5. Renderizar plantilla con todos los datos
+    2. Obtener los datos de la búsqueda (ver search_artist, con caché)
+    3. Renderizar plantilla con todos los datos
     """
     # Valores iniciales
     artist_name = ""
     artist_info = None
     top_tracks = []
-    events_with_playlists = []
     
     if request.method == "POST":
-        # Paso 1: Obtener artista del formulario
-        artist_name = request.form.get("artista", "").strip()
+        # Paso 1: Obtener artista del formulario. Se normaliza a NFC (los
+        # acentos escritos como letra + marca combinante quedan en un solo
+        # carácter), se descartan caracteres de control y se limita la longitud
+        artist_name = unicodedata.normalize("NFC", request.form.get("artista", ""))
+        artist_name = "".join(ch for ch in artist_name if unicodedata.category(ch)[0] != "C")
+        artist_name = artist_name.strip()[:MAX_ARTIST_NAME_LENGTH]
 
         # Validación básica
         if not artist_name:
             return render_template("index.html", error="Please write an artist")
+
+        # Rechaza nombres imposibles antes de gastar llamadas a Spotify y Ticketmaster
+        if not is_valid_artist_name(artist_name):
+            return render_template("index.html", error="Invalid artist name")
         
-        # Paso 2: Obtener información del artista desde Spotify
-        artist_info = SpotifyService.get_artist_info(artist_name)
-        
-        if artist_info:
-            # Paso 3: Obtener canciones populares si existe el artista
-            artist_id = artist_info["id"]
-            top_tracks = SpotifyService.get_top_tracks(artist_id)
-            
-            # Paso 4: Obtener playlists por género (primer género disponible)
-            artist_genres = artist_info.get("genres", [])
-            if artist_genres:
-                genre = artist_genres[0]
-                playlists = SpotifyService.get_playlists_by_genre(genre)
-                if playlists:
-                    # Selecciona playlist aleatoria para recomendación
-                    random_playlist = random.choice(playlists)
-                    artist_info["playlist"] = random_playlist
-        
-        # Paso 5: Obtener conciertos del artista
-        events = ConcertService.get_events(artist_name)
-        
-        if not events:
+        # Paso 2: Datos de la búsqueda (caché por nombre normalizado)
+        results = search_artist(normalize_key(artist_name))
+
+        if not results["events"]:
             return render_template("index.html", 
                                  error=f"No concert found for {artist_name}",
                                  artist_name=artist_name,
-                                 artist_info=artist_info,
-                                 top_tracks=top_tracks,
+                                 artist_info=results["artist_info"],
+                                 top_tracks=results["top_tracks"],
                                  google_maps_api_key=GOOGLE_MAPS_API_KEY)
-        
-        # Paso 6: Procesar cada evento (clima + geocodificación)
-        for event in events:
-            venue = event.get("_embedded", {}).get("venues", [{}])[0]
-            city = venue.get("city", {}).get("name", "Ciudad desconocida")
-            
-            # Geocodificación con Google Maps
-            geocode_result = gmaps.geocode(city)
-            lat, lng = None, None
-            if geocode_result:
-                location = geocode_result[0]['geometry']['location']
-                lat, lng = location['lat'], location['lng']
-
-            # Obtener clima para la ciudad
-            weather_data = WeatherService.get_weather(city)
-
-            # Estructura de datos para la plantilla
-            event_data = {
-                "city": city,
-                "date": event.get("dates", {}).get("start", {}).get("localDate", "Fecha no disponible"),
-                "venue": venue.get("name", "Lugar no disponible"),
-                "tickets_url": event.get("url", "#"),
-                "weather": weather_data,
-                "location": {"lat": lat, "lng": lng},
-                "playlist": artist_info.get("playlist", {}) if artist_info else {}
-            }
-            events_with_playlists.append(event_data)
-
-        # Renderizar con todos los datos
-        return render_template("index.html", 
-                             events=events_with_playlists,
-                             artist_name=artist_name,
-                             artist_info=artist_info,
-                             top_tracks=top_tracks,
-                             google_maps_api_key=GOOGLE_MAPS_API_KEY)
+
+        # Paso 3: Renderizar con todos los datos. Los datos ya están completos,
+        # así que el streaming solo sirve para que el navegador empiece con el
+        # <head> (CSS) mientras Jinja genera las tarjetas. Se agrupa la salida
+        # en bloques de ~40 fragmentos para no mandar cientos de writes de
+        # pocos bytes
+        context = {
+            "events": results["events"],
+            "artist_name": artist_name,
+            "artist_info": results["artist_info"],
+            "top_tracks": results["top_tracks"],
+            "google_maps_api_key": GOOGLE_MAPS_API_KEY
+        }
+        app.update_template_context(context)
+        stream = app.jinja_env.get_template("index.html").stream(context)
+        stream.enable_buffering(size=40)
+        return Response(stream_with_context(stream), mimetype="text/html")
     
     # GET: Mostrar formulario vacío
     return render_template("index.html", 
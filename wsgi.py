@@ -0,0 +1,20 @@
+"""
+Punto de entrada WSGI para producción.
+
+El servidor de desarrollo de Flask atiende una petición a la vez, y cada
+búsqueda espera a varias APIs externas. Gunicorn con workers "gthread"
+permite que cada petición espere en su propio hilo:
+
+    gunicorn -w 3 -k gthread --threads 16 --timeout 30 wsgi:app
+
+Regla habitual para el número de workers: 2 * núcleos + 1.
+Si gunicorn está detrás de un proxy inverso (nginx, balanceador...), define
+TRUSTED_PROXIES=1 (número de proxies) en el .env para que el límite de
+peticiones se aplique por cliente y no a la IP del proxy.
+Para desarrollo local sigue valiendo `python app.py`.
+"""
+
+from app import app
+
+if __name__ == "__main__":
+    app.run()